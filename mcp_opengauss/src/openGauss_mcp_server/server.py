@@ -1,9 +1,17 @@
 import asyncio
+import csv
+import io
 import logging
 import os
-import psycopg2
-from psycopg2 import Error, sql, connect
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from psycopg import Error, sql
+from psycopg.conninfo import make_conninfo
+from psycopg_pool import AsyncConnectionPool
 from mcp.server import Server
+from mcp.server.stdio import stdio_server
 from mcp.types import Resource, Tool, TextContent
 from pydantic import AnyUrl
 
@@ -14,10 +22,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger("openGauss_mcp_server")
 
+@lru_cache(maxsize=1)
 def get_db_config():
-    """Get database configuration from environment variables."""
+    """Get database configuration from environment variables.
+
+    The result is cached for the lifetime of the process; tests can call
+    ``get_db_config.cache_clear()`` after changing the environment.
+    """
     config = {
-        "host": os.getenv("", "localhost"),
+        "host": os.getenv("OPENGAUSS_HOST", "localhost"),
         "port": int(os.getenv("OPENGAUSS_PORT", "5432")), 
         "user": os.getenv("OPENGAUSS_USER"),
         "password": os.getenv("OPENGAUSS_PASSWORD"),
@@ -28,31 +41,114 @@ def get_db_config():
     
     return config
 
+# Connection pool, created once on first use so a single TCP+auth handshake
+# is paid per pooled connection instead of per request.
+POOL = None
+POOL_MIN_CONN = 1
+POOL_MAX_CONN = 10
+POOL_TIMEOUT = float(os.getenv("OPENGAUSS_POOL_TIMEOUT", "30"))
+
+async def configure_connection(conn):
+    """Applied by the pool to every new connection.
+
+    A threshold of 1 makes psycopg server-side prepare any statement from
+    its second execution, so repeated execute_sql queries skip the server
+    parse/plan step. The cache is per connection and keyed by query text.
+
+    Autocommit spares read-only requests the implicit BEGIN/ROLLBACK pair
+    per checkout; paths that need a transaction open one explicitly.
+    """
+    conn.prepare_threshold = 1
+    await conn.set_autocommit(True)
+
+async def get_pool() -> AsyncConnectionPool:
+    """Return the shared connection pool, creating it on first use."""
+    global POOL
+    if POOL is None:
+        POOL = AsyncConnectionPool(
+            make_conninfo(**get_db_config()),
+            min_size=POOL_MIN_CONN,
+            max_size=POOL_MAX_CONN,
+            timeout=POOL_TIMEOUT,
+            configure=configure_connection,
+            open=False,
+        )
+        await POOL.open()
+    return POOL
+
+# Connection bound to the current asyncio task, so nested get_conn() calls
+# within one request share a connection and transaction instead of paying
+# another pool checkout.
+TASK_CONN = ContextVar("opengauss_task_conn", default=None)
+
+@asynccontextmanager
+async def get_conn():
+    """Borrow a connection for the current task, reusing a held one."""
+    conn = TASK_CONN.get()
+    if conn is not None:
+        yield conn
+        return
+    pool = await get_pool()
+    async with pool.connection() as conn:
+        token = TASK_CONN.set(conn)
+        try:
+            yield conn
+        finally:
+            TASK_CONN.reset(token)
+
+# Cached public-schema table listing shared by list_resources and \d.
+# pg_tables materializes from the catalogs on every scan, so one scan is
+# amortized over the frequent listing pings from MCP clients.
+TABLE_CACHE = None
+TABLE_CACHE_TTL = 30.0
+
+async def list_public_tables(conn):
+    """Return the public-schema pg_tables rows, cached for a short TTL."""
+    global TABLE_CACHE
+    now = time.monotonic()
+    if TABLE_CACHE is not None and now - TABLE_CACHE[0] < TABLE_CACHE_TTL:
+        return TABLE_CACHE[1]
+    async with conn.cursor() as cursor:
+        await cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'", prepare=True)
+        tables = await cursor.fetchall()
+    TABLE_CACHE = (now, tables)
+    return tables
+
+def invalidate_table_cache():
+    """Drop the cached table listing (called after DDL/DML statements)."""
+    global TABLE_CACHE
+    TABLE_CACHE = None
+
+def format_result(columns, rows) -> str:
+    """Render a result set as CSV text: one header row plus data rows."""
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buf.getvalue().rstrip("\n")
+
 # Initialize server
 app = Server("openGauss_mcp_server")
 
 @app.list_resources()
 async def list_resources() -> list[Resource]:
     """List openGauss tables as resources."""
-    config = get_db_config()
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
-                tables = cursor.fetchall()
-                logger.info(f"Found tables: {tables}")
-
-                resources = []
-                for table in tables:
-                    resources.append(
-                        Resource(
-                            uri=f"openGauss://{table[0]}/data",
-                            name=f"Table: {table[0]}",
-                            mimeType="text/plain",
-                            description=f"Data in table: {table[0]}"
-                        )
+        async with get_conn() as conn:
+            tables = await list_public_tables(conn)
+            logger.info("Found tables: %s", tables)
+
+            resources = []
+            for table in tables:
+                resources.append(
+                    Resource(
+                        uri=f"openGauss://{table[0]}/data",
+                        name=f"Table: {table[0]}",
+                        mimeType="text/plain",
+                        description=f"Data in table: {table[0]}"
                     )
-                return resources
+                )
+            return resources
     except Error as e:
         logger.error(f"Failed to list resources: {str(e)}")
         return []
@@ -60,24 +156,29 @@ async def list_resources() -> list[Resource]:
 @app.read_resource()
 async def read_resource(uri: AnyUrl) -> str:
     """Read table contents."""
-    config = get_db_config()
     uri_str = str(uri)
-    logger.info(f"Reading resource: {uri_str}")
+    logger.info("Reading resource: %s", uri_str)
     
     if not uri_str.startswith("openGauss://"):
         raise ValueError(f"Invalid URI scheme: {uri_str}")
         
-    parts = uri_str[8:].split('/')
-    table = parts[0]
+    # Slice the table name out directly ("openGauss://" is 12 characters)
+    # instead of allocating a list of path parts just to index the first.
+    rest = uri_str[12:]
+    slash = rest.find('/')
+    table = rest if slash < 0 else rest[:slash]
     
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(f"SELECT * FROM {table} LIMIT 100")
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                result = [",".join(map(str, row)) for row in rows]
-                return "\n".join([",".join(columns)] + result)
+        async with get_conn() as conn:
+            async with conn.cursor() as cursor:
+                # Let the server serialize the rows straight to CSV; no
+                # per-row Python objects or client-side formatting pass.
+                stmt = sql.SQL("COPY (SELECT * FROM {tbl} LIMIT 100) TO STDOUT WITH CSV HEADER").format(tbl=sql.Identifier(table))
+                buf = io.BytesIO()
+                async with cursor.copy(stmt) as copy:
+                    async for data in copy:
+                        buf.write(data)
+                return buf.getvalue().decode().rstrip("\n")
                 
     except Error as e:
         logger.error(f"Database error reading resource {uri}: {str(e)}")
@@ -105,54 +206,46 @@ async def list_tools() -> list[Tool]:
     ]
 
 
-def handle_meta_command(cursor, query: str, config: dict) -> list[TextContent]:
-    """Handle OpenGauss meta-commands (e.g., \d, \dt)."""
+# Meta-command -> (catalog query, output columns). \d is handled separately
+# because it reads from the cached table listing.
+META_COMMANDS = {
+    "\\dt": (
+        "SELECT tablename, tableowner, tablespace FROM pg_tables WHERE schemaname = 'public'",
+        ["Table", "Owner", "Tablespace"],
+    ),
+    "\\d+": (
+        "SELECT tablename, tableowner, tablespace, hasindexes, hasrules, hastriggers FROM pg_tables WHERE schemaname = 'public'",
+        ["Table", "Owner", "Tablespace", "Has Indexes", "Has Rules", "Has Triggers"],
+    ),
+    "\\du": (
+        "SELECT rolname, rolsuper, rolinherit, rolcreaterole, rolcreatedb, rolcanlogin FROM pg_roles",
+        ["Role", "Superuser", "Inherit", "Create Role", "Create DB", "Can Login"],
+    ),
+}
+
+async def handle_meta_command(cursor, query: str, config: dict) -> list[TextContent]:
+    """Handle OpenGauss meta-commands (e.g., \\d, \\dt)."""
     command = query.strip()
-    
-    # Handle \d (list tables)
+
+    # \d (list tables) shares the cached listing used by list_resources
     if command == "\\d":
-        cursor.execute("SELECT tablename FROM pg_tables WHERE schemaname = 'public'")
-        tables = cursor.fetchall()
-        result = ["Tables_in_" + config["dbname"]]  # Header
-        result.extend([table[0] for table in tables])
-        return [TextContent(type="text", text="\n".join(result))]
-    
-    # Handle \dt (list tables with details)
-    elif command == "\\dt":
-        cursor.execute("SELECT tablename, tableowner, tablespace FROM pg_tables WHERE schemaname = 'public'")
-        columns = ["Table", "Owner", "Tablespace"]
-        rows = cursor.fetchall()
-        result = [",".join(columns)]  # Header
-        result.extend([",".join(map(str, row)) for row in rows])
-        return [TextContent(type="text", text="\n".join(result))]
-    
-    # Handle \d+ (list tables with extended details)
-    elif command == "\\d+":
-        cursor.execute("SELECT tablename, tableowner, tablespace, hasindexes, hasrules, hastriggers FROM pg_tables WHERE schemaname = 'public'")
-        columns = ["Table", "Owner", "Tablespace", "Has Indexes", "Has Rules", "Has Triggers"]
-        rows = cursor.fetchall()
-        result = [",".join(columns)]  # Header
-        result.extend([",".join(map(str, row)) for row in rows])
-        return [TextContent(type="text", text="\n".join(result))]
-    
-    # Handle \du (list users and roles)
-    elif command == "\\du":
-        cursor.execute("SELECT rolname, rolsuper, rolinherit, rolcreaterole, rolcreatedb, rolcanlogin FROM pg_roles")
-        columns = ["Role", "Superuser", "Inherit", "Create Role", "Create DB", "Can Login"]
-        rows = cursor.fetchall()
-        result = [",".join(columns)]  # Header
-        result.extend([",".join(map(str, row)) for row in rows])
-        return [TextContent(type="text", text="\n".join(result))]
-    
-    # Unsupported meta-command
-    else:
+        tables = await list_public_tables(cursor.connection)
+        return [TextContent(type="text", text=format_result(["Tables_in_" + config["dbname"]], tables))]
+
+    spec = META_COMMANDS.get(command)
+    if spec is None:
         return [TextContent(type="text", text=f"Unsupported meta-command: {command}")]
 
+    query_text, columns = spec
+    await cursor.execute(query_text, prepare=True)
+    rows = await cursor.fetchall()
+    return [TextContent(type="text", text=format_result(columns, rows))]
+
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Execute SQL commands."""
     config = get_db_config()
-    logger.info(f"Calling tool: {name} with arguments: {arguments}")
+    logger.info("Calling tool: %s with arguments: %s", name, arguments)
     
     if name != "execute_sql":
         raise ValueError(f"Unknown tool: {name}")
@@ -161,26 +254,41 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     if not query:
         raise ValueError("Query is required")
     
+    # Classify the query once; uppercasing only the first token avoids
+    # copying the whole query string on every call.
+    stripped = query.lstrip()
+    is_meta = stripped.startswith("\\")
+    is_select = stripped[:6].upper() == "SELECT" and (len(stripped) == 6 or not stripped[6].isalnum())
+
     try:
-        with connect(**config) as conn:
-            with conn.cursor() as cursor:
-                
-                if query.strip().startswith("\\"):
-                    return handle_meta_command(cursor, query, config)
-                
-                # Execute regular SQL queries
-                cursor.execute(query)
-
-                # Regular SELECT queries
-                if query.strip().upper().startswith("SELECT"):
-                    columns = [desc[0] for desc in cursor.description]
-                    rows = cursor.fetchall()
-                    result = [",".join(map(str, row)) for row in rows]
-                    return [TextContent(type="text", text="\n".join([",".join(columns)] + result))]
-                
-                # Non-SELECT queries
-                else:
-                    conn.commit()
+        async with get_conn() as conn:
+            if is_meta:
+                async with conn.cursor() as cursor:
+                    return await handle_meta_command(cursor, query, config)
+
+            # Regular SELECT queries: stream through a server-side cursor so
+            # arbitrary user SQL cannot materialize an unbounded result set
+            # in memory at once.
+            if is_select:
+                # The named cursor needs a transaction block even though the
+                # connection is in autocommit mode.
+                async with conn.transaction():
+                    async with conn.cursor(name="execute_sql_stream") as cursor:
+                        cursor.itersize = 1000
+                        await cursor.execute(query)
+                        buf = io.StringIO()
+                        writer = csv.writer(buf, lineterminator="\n")
+                        desc = cursor.description
+                        writer.writerow([d[0] for d in desc])
+                        async for row in cursor:
+                            writer.writerow(row)
+                        return [TextContent(type="text", text=buf.getvalue().rstrip("\n"))]
+
+            # Non-SELECT queries commit as they execute (autocommit)
+            else:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(query)
+                    invalidate_table_cache()
                     return [TextContent(type="text", text=f"Query executed successfully. Rows affected: {cursor.rowcount}")]
                 
     except Error as e:
@@ -189,11 +297,10 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
 
 async def main():
     """Main entry point to run the MCP server."""
-    from mcp.server.stdio import stdio_server
-    
     logger.info("Starting openGauss MCP server...")
     config = get_db_config()
-    logger.info(f"Database config: {config['host']}/{config['dbname']} as {config['user']}")
+    logger.info("Database config: %s/%s as %s", config["host"], config["dbname"], config["user"])
+    await get_pool()
     async with stdio_server() as (read_stream, write_stream):
         try:
             await app.run(
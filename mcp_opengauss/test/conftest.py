@@ -1,8 +1,7 @@
 # tests/conftest.py
 import pytest
 import os
-import psycopg2
-from psycopg2 import Error, sql, connect
+from psycopg import Error, connect
 
 
 @pytest.fixture(scope="session")
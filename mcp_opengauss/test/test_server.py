@@ -35,7 +35,7 @@ async def test_call_tool_missing_query():
 @pytest.mark.asyncio
 @pytest.mark.skipif(
     not all([
-        pytest.importorskip("psycopg2"),
+        pytest.importorskip("psycopg"),
         pytest.importorskip("openGauss_mcp_server")
     ]),
     reason="openGauss connection not available"